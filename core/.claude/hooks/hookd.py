@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Hook Daemon
+
+Keeps the safety hooks loaded in one long-lived process so each tool call
+skips interpreter startup, imports and pattern compilation. The same script
+is the client: it forwards the hook's stdin to the daemon over a Unix socket
+and relays the response, starting the daemon on first use.
+
+Usage (in settings.json, instead of running a hook directly):
+    python3 $CLAUDE_PROJECT_DIR/.claude/hooks/hookd.py project-boundary
+"""
+
+import atexit
+import hashlib
+import importlib
+import importlib.util
+import io
+import json
+import os
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+HOOKS = ("pre-tool-use-safety", "project-boundary", "prompt-safety-check")
+IDLE_TIMEOUT = 30 * 60  # Exit after 30 minutes without requests
+CLIENT_TIMEOUT = 10
+
+# Loaded hook modules: name -> ((mtime, pattern_scan mtime), module)
+_hooks = {}
+# The hooks' shared pattern_scan module, once imported: (mtime, module)
+_pattern_scan = None
+
+
+def socket_path() -> str:
+    """Socket path for this hooks directory, so projects never share a daemon"""
+    digest = hashlib.blake2b(HOOKS_DIR.encode(), digest_size=6).hexdigest()
+    return os.path.expanduser(f"~/.claude/run/hookd-{digest}.sock")
+
+
+def load_pattern_scan() -> tuple:
+    """Import pattern_scan.py once, re-running it when the file changes"""
+    global _pattern_scan
+    mtime = os.stat(os.path.join(HOOKS_DIR, "pattern_scan.py")).st_mtime_ns
+    if _pattern_scan is None:
+        import pattern_scan
+        _pattern_scan = (mtime, pattern_scan)
+    elif _pattern_scan[0] != mtime:
+        module = _pattern_scan[1]
+        with_re2 = module.re2 is not None
+        importlib.reload(module)  # Resets re2 to None
+        if with_re2:
+            module.enable_re2()
+        _pattern_scan = (mtime, module)
+    return _pattern_scan
+
+
+def load_hook(hook: str):
+    """Import a hook script once, reloading it when it or pattern_scan.py changes"""
+    path = os.path.join(HOOKS_DIR, f"{hook}.py")
+    # The hooks import names from pattern_scan, so a new copy needs a reload too
+    key = (os.stat(path).st_mtime_ns, load_pattern_scan()[0])
+    cached = _hooks.get(hook)
+    if cached and cached[0] == key:
+        return cached[1]
+    if cached:
+        unload_hook(cached[1])
+
+    spec = importlib.util.spec_from_file_location(hook.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _hooks[hook] = (key, module)
+    return module
+
+
+def unload_hook(module):
+    """Close the log a replaced hook module holds open, and drop its exit handler"""
+    close_log_fd = getattr(module, 'close_log_fd', None)
+    if close_log_fd is not None:
+        atexit.unregister(close_log_fd)
+        close_log_fd()
+
+
+def run_hook(request: dict) -> dict:
+    """Run a hook's main() against a forwarded request and capture its output"""
+    hook = request['hook']
+    if hook not in HOOKS:
+        raise ValueError(f"Unknown hook: {hook}")
+    module = load_hook(hook)
+
+    # Reproduce the client's working directory and Claude environment
+    os.chdir(request['cwd'])
+    for name in [name for name in os.environ if name.startswith('CLAUDE_')]:
+        del os.environ[name]
+    os.environ.update(request['env'])
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    saved_stdin = sys.stdin
+    sys.stdin = io.TextIOWrapper(io.BytesIO(request['stdin'].encode()), encoding='utf-8')
+    code = 0
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            module.main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0
+    finally:
+        sys.stdin = saved_stdin
+
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "code": code}
+
+
+def recv_all(conn: socket.socket) -> bytes:
+    """Read from a socket until the peer shuts down its side"""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def daemon_running(path: str) -> bool:
+    """Check whether a daemon is already accepting on the socket"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def serve():
+    """Accept hook requests until idle for IDLE_TIMEOUT"""
+    import fcntl  # Unix only, like the daemon itself
+
+    path = socket_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if daemon_running(path):
+        return
+    # Held for the daemon's lifetime: of several daemons started at once
+    # (before any has bound the socket), only one gets past this point
+    lock = open(f"{path}.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return
+    try:
+        os.unlink(path)  # Stale socket from a daemon that died
+    except FileNotFoundError:
+        pass
+
+    # Worth its import time here: hooks are compiled once per daemon
+    load_pattern_scan()[1].enable_re2()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(16)
+    server.settimeout(IDLE_TIMEOUT)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            with conn:
+                try:
+                    response = run_hook(json.loads(recv_all(conn)))
+                except Exception as e:
+                    # Fail open, like the hooks themselves
+                    response = {"stdout": "", "stderr": f"Hook daemon error: {e}\n", "code": 0}
+                try:
+                    conn.sendall(json.dumps(response).encode())
+                except OSError:
+                    pass  # The client went away (e.g. a daemon_running() probe)
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        lock.close()
+
+
+def start_daemon():
+    """Launch the daemon in the background, detached from this hook call"""
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve'],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def forward(request: dict) -> dict:
+    """Send a request to the daemon and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(CLIENT_TIMEOUT)
+        conn.connect(socket_path())
+        conn.sendall(json.dumps(request).encode())
+        conn.shutdown(socket.SHUT_WR)
+        return json.loads(recv_all(conn))
+
+
+def main():
+    if sys.argv[1:] == ['--serve']:
+        serve()
+        return
+    if len(sys.argv) != 2 or sys.argv[1] not in HOOKS:
+        sys.stderr.write(f"Usage: hookd.py {{{'|'.join(HOOKS)}}} | --serve\n")
+        sys.exit(0)
+
+    request = {
+        "hook": sys.argv[1],
+        "cwd": os.getcwd(),
+        "env": {k: v for k, v in os.environ.items() if k.startswith('CLAUDE_')},
+        "stdin": sys.stdin.buffer.read().decode('utf-8', 'replace'),
+    }
+
+    if not hasattr(socket, 'AF_UNIX'):
+        response = run_hook(request)  # No Unix sockets (Windows) - run in-process
+    else:
+        try:
+            response = forward(request)
+        except (OSError, ValueError):
+            # No daemon yet (or it misbehaved): start one and run in-process this time
+            start_daemon()
+            response = run_hook(request)
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    sys.exit(response['code'])
+
+
+if __name__ == "__main__":
+    main()
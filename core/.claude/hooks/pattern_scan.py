@@ -0,0 +1,210 @@
+"""
+Pattern Scanning
+
+Shared by the safety hooks: compiles their pattern lists, with RE2 once
+enabled when a pattern is RE2-compatible, and runs the cheap literal
+pre-screen that lets most inputs skip the regex scans entirely.
+"""
+
+import re
+
+# RE2 (pip install google-re2) takes several milliseconds to import, more
+# than a one-shot hook spends matching, so it is only enabled by the
+# long-lived hook daemon (hookd.py) via enable_re2()
+re2 = None
+
+
+def enable_re2() -> bool:
+    """Compile subsequent scans with RE2 if it is installed"""
+    global re2
+    try:
+        import re2 as engine
+    except ImportError:
+        return False
+    re2 = engine
+    return True
+
+
+# Python's \s (str.isspace() characters); RE2's \s is only [\t\n\f\r ]
+_RE2_SPACE = (r"\x{9}-\x{d}\x{1c}-\x{20}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}"
+              r"\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}")
+# Python's $ also matches before a trailing newline; RE2's only at the end
+_RE2_END = r"(?:\n?\z)"
+
+
+def re2_source(source: str):
+    r"""Rewrite a ``re`` pattern so RE2 matches exactly the same strings.
+
+    Translates ``$``, ``\s`` and ``\S`` to their Python meaning. Returns None
+    for constructs whose meaning differs and isn't translated (``\d``,
+    ``\w``, ``\b``, ...), so the caller keeps the ``re`` engine.
+    """
+    out = []
+    i = 0
+    while i < len(source):
+        c = source[i]
+        if c == "\\":
+            escape = source[i:i + 2]
+            if escape == r"\s":
+                out.append(f"[{_RE2_SPACE}]")
+            elif escape == r"\S":
+                out.append(f"[^{_RE2_SPACE}]")
+            elif escape[1:] in "dDwWbBAZ":
+                return None
+            else:
+                out.append(escape)
+            i += 2
+        elif c == "[":
+            # Character class: find its end (a leading ] is a literal)
+            end = i + 1
+            if source[end:end + 1] == "^":
+                end += 1
+            if source[end:end + 1] == "]":
+                end += 1
+            while end < len(source) and source[end] != "]":
+                end += 2 if source[end] == "\\" else 1
+            body = source[i + 1:end]
+            if r"\s" in body and r"\S" in body:
+                out.append("[" + body + "]")  # Any character in both engines
+            elif r"\S" in body or any(f"\\{e}" in body for e in "dDwW"):
+                return None
+            else:
+                out.append("[" + body.replace(r"\s", _RE2_SPACE) + "]")
+            i = end + 1
+        elif c == "$":
+            out.append(_RE2_END)
+            i += 1
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+
+def compile_pattern(source: str, ignore_case: bool = False):
+    """Compile a pattern with RE2 when available, else ``re``.
+
+    RE2 guarantees linear-time scans but has no lookarounds, so unsupported
+    patterns fall back to the standard backtracking engine. The pattern is
+    translated first so both engines accept exactly the same inputs.
+    """
+    if ignore_case:
+        source = "(?i)" + source
+    translated = re2_source(source) if re2 is not None else None
+    if translated is not None:
+        options = re2.Options()
+        options.log_errors = False
+        try:
+            return re2.compile(translated, options)
+        except re2.error:
+            pass  # Unsupported syntax - fall back to the backtracking engine
+    return re.compile(source)
+
+
+# How an exemption follows a match, as the lookahead each kind stands for
+RIGHT_AFTER = "(?!{})"             # word(?!X)
+LATER_ON_LINE = r"(?!\s+.*{})"     # word(?!\s+.*X)
+SPACE_THEN_LINE = r"\s+(?!.*{})"   # word\s+(?!.*X)
+
+_SPACES = re.compile(r"\s*")
+
+
+def _cursor(find):
+    """Memoize find(pos) -> next position at or after pos, for rising pos"""
+    last = [-1]
+
+    def lookup(pos):
+        if pos > last[0]:
+            last[0] = find(pos)
+        return last[0]
+    return lookup
+
+
+class Unless:
+    r"""Stands in for a pattern ending in a negative lookahead, which RE2 lacks.
+
+    ``search`` finds ``word`` (after ``lead\s+.*`` when given) with either
+    engine, then drops each match that the literal ``exempt`` follows the
+    way ``kind`` describes. That check runs in Python in linear time and
+    finds exactly the inputs ``re`` finds with the lookahead ``pattern``.
+    """
+
+    def __init__(self, word: str, kind: str, exempt: str, lead: str = None,
+                 ignore_case: bool = False):
+        self.pattern = (lead + r"\s+.*" if lead else "") + word + kind.format(exempt)
+        self.kind = kind
+        self.word = compile_pattern(word, ignore_case)
+        # Searched from many positions: RE2 would re-encode the text each time,
+        # and a literal needs no backtracking anyway
+        self.exempt = re.compile(re.escape(exempt), re.I if ignore_case else 0)
+        self.lead = compile_pattern(lead + r"\s+", ignore_case) if lead else None
+
+    def search(self, text: str):
+        """The first match of ``word`` that isn't exempted, or None"""
+        first = self.word.search(text)
+        if first is None:
+            return None
+
+        def found(pos):
+            return len(text) if pos < 0 else pos
+
+        def next_exempt(pos):
+            match = self.exempt.search(text, pos)
+            return match.start() if match else len(text)
+
+        line_end = _cursor(lambda pos: found(text.find("\n", pos)))
+        lead_line_end = _cursor(lambda pos: found(text.find("\n", pos)))
+        exempt_start = _cursor(next_exempt)
+        leads = self.lead.finditer(text) if self.lead else iter(())
+        lead, reach = next(leads, None), None
+        for match in self.word.finditer(text, first.start()):
+            if self.lead:
+                # lead\s+.* reaches the rest of the line its spaces end on
+                while lead is not None and lead.end() <= match.start():
+                    lead, reach = next(leads, None), lead.end()
+                if reach is None or lead_line_end(reach) < match.start():
+                    continue
+            end = match.end()
+            if self.kind == RIGHT_AFTER:
+                if not self.exempt.match(text, end):
+                    return match
+                continue
+            # Backtracking may end \s+ anywhere in the run of spaces, and .*
+            # stops at a newline: only the line the run ends on can exempt
+            spaces = _SPACES.match(text, end).end()
+            if spaces == end:
+                if self.kind == LATER_ON_LINE:
+                    return match
+                continue
+            if self.kind == SPACE_THEN_LINE and line_end(end + 1) < spaces:
+                return match  # \s+ can stop at that newline, leaving .* nothing
+            if exempt_start(spaces) >= line_end(spaces):
+                return match
+        return None
+
+
+# Trips every input contains: the pre-screen never skips a scan
+ALWAYS_SCAN = ("",)
+
+
+def has_literal_trip(text: str, trips: tuple) -> bool:
+    """Cheap substring pre-screen run before any regex scan"""
+    folded = text.casefold()
+    return any(trip in folded for trip in trips)
+
+
+def check_literal_trips(patterns: list, examples: list, trips: tuple):
+    """Verify that each pattern's example gets past the literal pre-screen.
+
+    ``examples[i]`` is an input that compiled ``patterns[i]`` must find (None
+    to skip it). A pattern whose example contains none of ``trips``, or that
+    misses its example, raises ValueError - a missing trip would otherwise
+    silently let every input through unscanned.
+    """
+    for pattern, example in zip(patterns, examples):
+        if example is None:
+            continue
+        if not has_literal_trip(example, trips):
+            raise ValueError(f"No literal trip in example {example!r}: "
+                             f"add one that {pattern.pattern!r} requires")
+        if not pattern.search(example):
+            raise ValueError(f"Example {example!r} is not matched by {pattern.pattern!r}")
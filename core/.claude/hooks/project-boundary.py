@@ -9,34 +9,100 @@ Detects project root by looking for .claude/ directory.
 import json
 import sys
 import os
-import re
 from pathlib import Path
 
+from pattern_scan import compile_pattern
+
+
+# Sensitive system paths, blocked even within the project
+_SYSTEM_PATH_SRC = [
+    r'^/etc/',
+    r'^/usr/',
+    r'^/var/',
+    r'^/bin/',
+    r'^/sbin/',
+    r'~/.ssh/',
+    r'~/.aws/',
+    r'/dev/',
+    r'/proc/',
+    r'/sys/'
+]
+
+# Operations that might escape the project boundary
+_DANGEROUS_BASH_SRC = [
+    # File operations outside project
+    (r'(cp|mv|rm|ln)\s+.*\.\./', 'File operations using ../ can escape project boundary'),
+    (r'(cp|mv|rm|ln)\s+.*/.*/', 'Absolute file paths may escape project boundary'),
+    
+    # System modifications
+    (r'sudo\s+', 'System-level operations are forbidden'),
+    (r'su\s+', 'User switching is forbidden'),
+    (r'chmod\s+.*(/usr/|/etc/|/var/)', 'System directory permission changes forbidden'),
+    
+    # Network operations that might affect system
+    (r'(wget|curl).*\|\s*(sh|bash)', 'Piping downloads to shell is dangerous'),
+    
+    # Package management outside project
+    (r'(apt|yum|brew|pacman)\s+install', 'System package installation should be manual'),
+]
+
+# Operations that are clearly within the project directory
+_SAFE_LOCAL_SRC = [
+    r'^ls\s',
+    r'^pwd$',
+    r'^cd\s+[^/]',  # Relative cd only
+    r'^find\s+\.\s',  # find starting from current dir
+    r'^grep\s+.*\s+\.',  # grep in current dir
+]
+
+# Compile each pattern list once per process
+SYSTEM_PATHS = [compile_pattern(p) for p in _SYSTEM_PATH_SRC]
+DANGEROUS_BASH = [(compile_pattern(p, ignore_case=True), m) for p, m in _DANGEROUS_BASH_SRC]
+SAFE_LOCAL = [compile_pattern(p) for p in _SAFE_LOCAL_SRC]
+
+# A plain `cd <target>`; tolerates surrounding whitespace instead of .strip()
+CD_COMMAND = compile_pattern(r'\s*cd\s+(.+?)\s*$')
+
 
 def find_project_root(start_path: Path = None) -> Path:
     """Find project root by looking for .claude directory"""
-    if start_path is None:
-        start_path = Path.cwd()
-    
-    current = start_path.resolve()
+    start = os.getcwd() if start_path is None else str(start_path.resolve())
     
-    # Walk up the directory tree looking for .claude
-    while current != current.parent:
-        if (current / ".claude").exists():
-            return current
-        current = current.parent
+    # Walk up the directory tree looking for .claude, using plain string
+    # paths rather than Path objects (one stat per level)
+    current = start
+    while current != os.path.dirname(current):
+        if os.path.exists(os.path.join(current, ".claude")):
+            return Path(current)
+        current = os.path.dirname(current)
     
     # If no .claude found, consider current directory as project root
-    return start_path.resolve()
+    return Path(start)
+
+
+def is_under(path: str, root: str) -> bool:
+    """Whether a normalized path is root itself or below it"""
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
 
 
 def is_within_project(file_path: str, project_root: Path) -> bool:
     """Check if a file path is within the project boundary"""
     try:
-        resolved_path = Path(file_path).resolve()
-        return project_root in resolved_path.parents or resolved_path == project_root
+        # abspath normalizes ../ segments lexically, without a syscall per component
+        path = os.path.abspath(file_path)
+        root = str(project_root)
+        if not is_under(path, root):
+            return False
+        # A symlink inside the project can point outside it (ln -s / escape):
+        # if any component below the root is one, check where the path really goes
+        current = path
+        while len(current) > len(root):
+            if os.path.islink(current):
+                return is_under(os.path.realpath(path), os.path.realpath(root))
+            current = os.path.dirname(current)
+        return True
     except Exception:
-        # If path resolution fails, be conservative and block
+        # If path normalization fails, be conservative and block
         return False
 
 
@@ -51,65 +117,24 @@ def validate_file_operation(tool_input: dict, project_root: Path):
         block_operation(f"File operation outside project boundary: {file_path}")
     
     # Check for sensitive system paths even within project
-    system_patterns = [
-        r'^/etc/',
-        r'^/usr/',
-        r'^/var/',
-        r'^/bin/',
-        r'^/sbin/',
-        r'~/.ssh/',
-        r'~/.aws/',
-        r'/dev/',
-        r'/proc/',
-        r'/sys/'
-    ]
-    
-    for pattern in system_patterns:
-        if re.match(pattern, file_path):
-            block_operation(f"Access to system directory blocked: {file_path}")
+    if any(rx.match(file_path) for rx in SYSTEM_PATHS):
+        block_operation(f"Access to system directory blocked: {file_path}")
 
 
 def validate_bash_command(tool_input: dict, project_root: Path):
     """Validate bash commands for project boundary compliance"""
     command = tool_input.get('command', '')
     
-    # Check for operations that might escape project boundary
-    dangerous_patterns = [
-        # File operations outside project
-        (r'(cp|mv|rm|ln)\s+.*\.\./', 'File operations using ../ can escape project boundary'),
-        (r'(cp|mv|rm|ln)\s+.*/.*/', 'Absolute file paths may escape project boundary'),
-        
-        # System modifications
-        (r'sudo\s+', 'System-level operations are forbidden'),
-        (r'su\s+', 'User switching is forbidden'),
-        (r'chmod\s+.*(/usr/|/etc/|/var/)', 'System directory permission changes forbidden'),
-        
-        # Network operations that might affect system
-        (r'(wget|curl).*\|\s*(sh|bash)', 'Piping downloads to shell is dangerous'),
-        
-        # Package management outside project
-        (r'(apt|yum|brew|pacman)\s+install', 'System package installation should be manual'),
-    ]
-    
-    for pattern, message in dangerous_patterns:
-        if re.search(pattern, command, re.IGNORECASE):
+    for rx, message in DANGEROUS_BASH:
+        if rx.search(command):
             block_operation(message)
     
     # Allow operations that are clearly within project directory
-    safe_local_patterns = [
-        r'^ls\s',
-        r'^pwd$',
-        r'^cd\s+[^/]',  # Relative cd only
-        r'^find\s+\.\s',  # find starting from current dir
-        r'^grep\s+.*\s+\.',  # grep in current dir
-    ]
-    
-    for pattern in safe_local_patterns:
-        if re.match(pattern, command):
-            return  # Explicitly safe, allow
+    if any(rx.match(command) for rx in SAFE_LOCAL):
+        return  # Explicitly safe, allow
     
     # For cd commands, ensure they stay within project
-    cd_match = re.match(r'^cd\s+(.+)$', command.strip())
+    cd_match = CD_COMMAND.match(command)
     if cd_match:
         target_path = cd_match.group(1).strip('\'"')
         if target_path.startswith('/'):
@@ -10,11 +10,16 @@ import os
 import sys
 import json
 import argparse
-import subprocess
+import io
+import tarfile
+import threading
+import http.client
+import urllib.error
 import urllib.request
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 class Colors:
@@ -27,13 +32,25 @@ class Colors:
     END = '\033[0m'
 
 
+# Concurrent downloads (and keep-alive connections) used while bootstrapping
+MAX_WORKERS = 16
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# ETags of fetched files, relative to the project root, for conditional re-runs
+ETAGS_FILE = ".claude/.bootstrap-etags.json"
+
+
 class ProjectBootstrap:
     """Handles project initialization and domain configuration"""
     
-    def __init__(self, base_url: str = "https://raw.githubusercontent.com/user/claude-project-best-practices/main"):
+    def __init__(self, base_url: str = "https://raw.githubusercontent.com/user/claude-project-best-practices/main",
+                 releases_url: str = "https://github.com/user/claude-project-best-practices/releases/download"):
         self.base_url = base_url
+        self.releases_url = releases_url
+        self.bundle = {}  # Repository path -> contents, from fetch_bundle()
         self.project_root = Path.cwd()
         self.available_domains = ["git", "python", "aws", "docker", "database"]
+        self._local = threading.local()  # Keep-alive connections, one set per thread
+        self.etags = {}  # Repository path -> ETag of the copy on disk
         
     def print_banner(self):
         """Display welcome banner"""
@@ -78,13 +95,17 @@ class ProjectBootstrap:
         print(f"\n🔧 Technology domains:")
         print(f"   ✅ Git (included by default)")
         
-        selected_domains = ["git"]
-        
-        for domain in self.available_domains[1:]:  # Skip git as it's mandatory
-            response = input(f"   ❓ Add {domain.title()}? (y/n) [n]: ").strip().lower()
-            if response in ['y', 'yes']:
-                selected_domains.append(domain)
+        optional_domains = self.available_domains[1:]  # Skip git as it's mandatory
+        while True:
+            response = input(f"   ❓ Add domains (comma-separated, from: {', '.join(optional_domains)}) [none]: ")
+            requested = [d.strip().lower() for d in response.split(',') if d.strip()]
+            unknown = [d for d in requested if d not in optional_domains]
+            if not unknown:
+                break
+            print(f"{Colors.RED}Unknown domain(s): {', '.join(unknown)}{Colors.END}")
         
+        selected_domains = ["git"]
+        selected_domains.extend(d for d in optional_domains if d in requested)
         config['domains'] = selected_domains
         
         # Project description
@@ -92,46 +113,148 @@ class ProjectBootstrap:
         
         return config
     
+    def _connection(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        """Return this thread's keep-alive connection to a host"""
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get((scheme, host))
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            conn = connections[(scheme, host)] = conn_class(host, timeout=30)
+        return conn
+    
+    def open_url(self, url: str, headers: Optional[Dict] = None):
+        """Open a URL, reusing a keep-alive connection for http(s)"""
+        headers = headers or {}
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            return urllib.request.urlopen(url)  # e.g. file:// for local testing
+        
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                if attempt:
+                    raise
+        
+        if response.status in (301, 302, 303, 307, 308):
+            response.read()
+            return urllib.request.urlopen(urllib.request.Request(response.getheader('Location'), headers=headers))
+        if response.status != 200:
+            response.read()
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+        return response
+    
+    def fetch_bundle(self, tag: str) -> bool:
+        """Download the release bundle of core and domain files in one request"""
+        url = f"{self.releases_url}/{tag}/claude-core-{tag}.tar.gz"
+        try:
+            with urllib.request.urlopen(url) as response:
+                buffer = io.BytesIO(response.read())
+            # Read members up front: worker threads can't share one tar stream
+            with tarfile.open(fileobj=buffer, mode='r:gz') as archive:
+                for member in archive.getmembers():
+                    if member.isfile():
+                        name = member.name[2:] if member.name.startswith('./') else member.name
+                        self.bundle[name] = archive.extractfile(member).read()
+            return True
+        except Exception as e:
+            print(f"{Colors.YELLOW}Release bundle unavailable ({e}), fetching files individually{Colors.END}")
+            return False
+    
+    def load_etags(self):
+        """Load the ETags recorded by a previous bootstrap run"""
+        try:
+            self.etags = json.loads((self.project_root / ETAGS_FILE).read_bytes())
+        except (OSError, ValueError):
+            self.etags = {}
+    
+    def save_etags(self):
+        """Record ETags so the next run can skip unchanged files"""
+        etags_path = self.project_root / ETAGS_FILE
+        etags_path.parent.mkdir(parents=True, exist_ok=True)
+        etags_path.write_text(json.dumps(self.etags, indent=2, sort_keys=True))
+    
     def fetch_file(self, path: str, destination: Path) -> bool:
-        """Fetch a file from the repository"""
+        """Fetch a file from the release bundle, or the repository if not bundled"""
         url = f"{self.base_url}/{path}"
         try:
             destination.parent.mkdir(parents=True, exist_ok=True)
-            urllib.request.urlretrieve(url, destination)
+            content = self.bundle.get(path)
+            if content is not None:
+                destination.write_bytes(content)
+                return True
+            
+            import shutil  # Only needed when streaming a download
+            
+            headers = {}
+            if path in self.etags and destination.exists():
+                headers['If-None-Match'] = self.etags[path]
+            # Stream to a temporary file so an interrupted download never
+            # leaves a truncated file in place
+            partial = destination.with_name(destination.name + '.part')
+            try:
+                with self.open_url(url, headers) as response, open(partial, 'wb') as f:
+                    shutil.copyfileobj(response, f, DOWNLOAD_CHUNK_SIZE)
+                    etag = response.headers.get('ETag')
+                os.replace(partial, destination)
+            finally:
+                if partial.exists():
+                    partial.unlink()
+            if etag:
+                self.etags[path] = etag
+            else:
+                self.etags.pop(path, None)
             return True
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return True  # Unchanged since the last run
+            sys.stdout.write(f"{Colors.RED}Failed to fetch {path}: {e}{Colors.END}\n")
+            return False
         except Exception as e:
-            print(f"{Colors.RED}Failed to fetch {path}: {e}{Colors.END}")
+            # Single write so messages from worker threads don't interleave
+            sys.stdout.write(f"{Colors.RED}Failed to fetch {path}: {e}{Colors.END}\n")
             return False
     
+    def fetch_files(self, files: List[Tuple[str, Path]]) -> List[bool]:
+        """Fetch (source path, destination) pairs concurrently"""
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            return list(executor.map(lambda f: self.fetch_file(*f), files))
+    
     def fetch_domain_manifest(self, domain: str) -> Optional[Dict]:
         """Fetch domain manifest file"""
         manifest_path = f"domains/{domain}/manifest.json"
+        if manifest_path in self.bundle:
+            return json.loads(self.bundle[manifest_path])
         try:
             url = f"{self.base_url}/{manifest_path}"
-            with urllib.request.urlopen(url) as response:
-                return json.loads(response.read().decode())
+            with self.open_url(url) as response:
+                return json.loads(response.read())
         except Exception as e:
-            print(f"{Colors.RED}Failed to fetch manifest for {domain}: {e}{Colors.END}")
+            sys.stdout.write(f"{Colors.RED}Failed to fetch manifest for {domain}: {e}{Colors.END}\n")
             return None
     
-    def apply_domain(self, domain: str, config: Dict) -> bool:
-        """Apply a domain configuration to the project"""
-        print(f"   📦 Applying {domain} domain...")
-        
-        manifest = self.fetch_domain_manifest(domain)
-        if not manifest:
-            return False
-        
-        # Fetch files specified in manifest
-        for dest_dir, files in manifest.get('files', {}).items():
-            for file_name in files:
+    def domain_files(self, domain: str, manifest: Dict) -> List[Tuple[str, Path]]:
+        """List the (source path, destination) pairs a domain manifest installs"""
+        files = []
+        for dest_dir, file_names in manifest.get('files', {}).items():
+            for file_name in file_names:
                 source_path = f"domains/{domain}/{dest_dir}/{file_name}".replace('//', '/')
-                dest_path = self.project_root / dest_dir / file_name
-                
-                if not self.fetch_file(source_path, dest_path):
-                    print(f"{Colors.YELLOW}Warning: Could not fetch {file_name}{Colors.END}")
-        
-        return True
+                files.append((source_path, self.project_root / dest_dir / file_name))
+        return files
+    
+    def warn_missing(self, files: List[Tuple[str, Path]], results: List[bool]):
+        """Warn about domain files that could not be fetched"""
+        for (source_path, _), fetched in zip(files, results):
+            if not fetched:
+                print(f"{Colors.YELLOW}Warning: Could not fetch {Path(source_path).name}{Colors.END}")
     
     def create_claude_md(self, config: Dict):
         """Create the CLAUDE.md file from template"""
@@ -182,6 +305,7 @@ TODO.md
 CLAUDE.local.md
 .claude/logs/
 .claude/session-history/
+.claude/.bootstrap-etags.json
 
 # OS
 .DS_Store
@@ -202,10 +326,13 @@ Thumbs.db
             gitignore_path.write_text(gitignore_content)
             print(f"   ✅ Created .gitignore")
         else:
-            # Append Claude-specific entries if not present
-            existing = gitignore_path.read_text()
-            if "# Claude Code specific" not in existing:
-                gitignore_path.write_text(existing + "\n" + gitignore_content)
+            # Append Claude-specific entries if not present, scanning line by
+            # line rather than loading and rewriting the whole file
+            with open(gitignore_path) as f:
+                present = any("# Claude Code specific" in line for line in f)
+            if not present:
+                with open(gitignore_path, 'a') as f:
+                    f.write("\n" + gitignore_content)
                 print(f"   ✅ Updated .gitignore")
     
     def setup_project(self, config: Dict):
@@ -222,17 +349,29 @@ Thumbs.db
             "core/.claude/settings.json",
             "core/.claude/hooks/pre-tool-use-safety.py",
             "core/.claude/hooks/project-boundary.py",
+            "core/.claude/hooks/prompt-safety-check.py",
+            "core/.claude/hooks/pattern_scan.py",
+            "core/.claude/hooks/hookd.py",
             "core/.claude/commands/help.md"
         ]
         
-        for file_path in core_files:
-            dest_path = self.project_root / file_path.replace("core/", "")
-            self.fetch_file(file_path, dest_path)
+        core_pairs = [(path, self.project_root / path.replace("core/", "")) for path in core_files]
         
-        # Apply domains
+        # Apply domains: fetch all manifests at once, then every file in one batch
         print(f"   🔧 Applying domains: {', '.join(config['domains'])}")
-        for domain in config['domains']:
-            self.apply_domain(domain, config)
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            manifests = list(executor.map(self.fetch_domain_manifest, config['domains']))
+        
+        domain_pairs = []
+        for domain, manifest in zip(config['domains'], manifests):
+            if manifest:
+                print(f"   📦 Applying {domain} domain...")
+                domain_pairs.extend(self.domain_files(domain, manifest))
+        
+        self.load_etags()
+        results = self.fetch_files(core_pairs + domain_pairs)
+        self.save_etags()
+        self.warn_missing(domain_pairs, results[len(core_pairs):])
         
         # Create project files
         self.create_claude_md(config)
@@ -272,10 +411,14 @@ def main():
     parser.add_argument("--type", help="Project type")
     parser.add_argument("--base-url", default="https://raw.githubusercontent.com/user/claude-project-best-practices/main",
                        help="Base URL for fetching configurations")
+    parser.add_argument("--releases-url", default="https://github.com/user/claude-project-best-practices/releases/download",
+                       help="Base URL for release bundles")
+    parser.add_argument("--bundle-tag",
+                       help="Fetch all files in one download from this release's bundle")
     
     args = parser.parse_args()
     
-    bootstrap = ProjectBootstrap(args.base_url)
+    bootstrap = ProjectBootstrap(args.base_url, args.releases_url)
     bootstrap.print_banner()
     
     if args.interactive or not (args.name and args.domains):
@@ -290,6 +433,9 @@ def main():
             'description': f"A {args.type or 'custom'} project"
         }
     
+    if args.bundle_tag:
+        bootstrap.fetch_bundle(args.bundle_tag)
+    
     bootstrap.setup_project(config)
 
 
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Pytest Daemon
+
+Keeps pytest imported in one long-lived process, so short test runs skip
+interpreter startup and most of pytest's own import time. Each run is forked
+from the warm process: test modules are imported fresh in the child, so
+edits are always picked up without any file watching.
+
+The same script is the client: it forwards its arguments to the daemon over
+a Unix socket, streams the output back and exits with pytest's exit code,
+starting the daemon on first use.
+
+Usage:
+    python scripts/pytest_daemon.py [pytest args]
+    python scripts/pytest_daemon.py tests/test_example.py::test_example_basic
+"""
+
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+
+
+IDLE_TIMEOUT = 30 * 60  # Exit after 30 minutes without requests
+# Marks the end of pytest's output; the exit code follows it
+SENTINEL = b"\0pytest-daemon-exit:"
+
+
+def socket_path() -> str:
+    """Socket path for this interpreter and project, so venvs never share a daemon"""
+    project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    key = f"{os.path.abspath(sys.executable)}\0{project}".encode()
+    digest = hashlib.blake2b(key, digest_size=6).hexdigest()
+    return os.path.expanduser(f"~/.cache/pytest-daemon/{digest}.sock")
+
+
+def warm_imports():
+    """Import pytest and its builtin plugins once, in the daemon.
+
+    Third-party plugins are left to each run: importing them here would stop
+    pytest from rewriting their assertions.
+    """
+    import importlib
+
+    import pytest  # noqa: F401
+    from _pytest.config import default_plugins
+
+    for name in default_plugins:
+        try:
+            importlib.import_module(f"_pytest.{name}")
+        except ImportError:
+            pass  # pytest will report it when the plugin is needed
+
+
+def recv_line(conn: socket.socket) -> bytes:
+    """Read one newline-terminated request from a socket"""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+def run_pytest(conn: socket.socket, request: dict) -> int:
+    """Run pytest in a forked child with its output sent to the client"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = 3  # pytest's "internal error" exit code
+        try:
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            devnull = os.open(os.devnull, os.O_RDONLY)
+            os.dup2(devnull, 0)
+            os.dup2(conn.fileno(), 1)
+            os.dup2(conn.fileno(), 2)
+
+            import pytest
+            code = int(pytest.main(request["args"]))
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def daemon_running(path: str) -> bool:
+    """Check whether a daemon is already accepting on the socket"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def serve(path: str):
+    """Accept test runs on the client's socket path until idle for IDLE_TIMEOUT"""
+    import fcntl  # Unix only, like the daemon itself
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if daemon_running(path):
+        return
+    # Held for the daemon's lifetime: of several daemons started at once
+    # (before any has bound the socket), only one gets past this point
+    lock = open(f"{path}.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return
+    try:
+        os.unlink(path)  # Stale socket from a daemon that died
+    except FileNotFoundError:
+        pass
+
+    warm_imports()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(16)
+    server.settimeout(IDLE_TIMEOUT)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            with conn:
+                conn.settimeout(None)
+                try:
+                    code = run_pytest(conn, json.loads(recv_line(conn)))
+                    conn.sendall(SENTINEL + str(code).encode())
+                except (OSError, ValueError, KeyError):
+                    pass  # The client went away or sent a bad request
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        lock.close()
+
+
+def start_daemon():
+    """Launch the daemon in the background, detached from this run.
+
+    The socket path is passed along rather than recomputed, so the daemon
+    listens where this client (and its interpreter) will look for it.
+    """
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", socket_path()],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def forward(args: list) -> int:
+    """Run pytest in the daemon, streaming its output, and return the exit code"""
+    if sys.stdout.isatty():
+        args = ["--color=yes", *args]  # Output goes through a socket, not a TTY
+    request = {"args": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path())
+        conn.sendall(json.dumps(request).encode() + b"\n")
+
+        out = sys.stdout.buffer
+        pending = b""
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            pending += chunk
+            end = pending.find(SENTINEL)
+            if end >= 0:
+                out.write(pending[:end])
+                pending = pending[end:]
+                continue
+            # Hold back anything that could be the start of the sentinel
+            keep = len(SENTINEL) - 1
+            if len(pending) > keep:
+                out.write(pending[:-keep])
+                out.flush()
+                pending = pending[-keep:]
+
+    out.flush()
+    if not pending.startswith(SENTINEL):
+        raise ConnectionError("Pytest daemon closed the connection without an exit code")
+    return int(pending[len(SENTINEL):])
+
+
+def main():
+    if sys.argv[1:2] == ["--serve"] and len(sys.argv) == 3:
+        serve(sys.argv[2])
+        return
+
+    args = sys.argv[1:]
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"):
+        # No Unix sockets or fork (Windows) - just run pytest
+        sys.exit(subprocess.call([sys.executable, "-m", "pytest", *args]))
+
+    try:
+        sys.exit(forward(args))
+    except (FileNotFoundError, ConnectionRefusedError):
+        # No daemon yet: start one for next time and run pytest directly now
+        start_daemon()
+        sys.exit(subprocess.call([sys.executable, "-m", "pytest", *args]))
+
+
+if __name__ == "__main__":
+    main()
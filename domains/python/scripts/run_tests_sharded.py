@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Sharded Test Runner
+
+Runs the whole test suite as several concurrent pytest processes instead of
+one. Test IDs are collected once, split into contiguous shards (so each
+module mostly stays on one shard) and each shard runs in its own pytest
+process, leaving two cores free for the editor or agent.
+
+Usage:
+    python scripts/run_tests_sharded.py [--shards N] [pytest options]
+
+With a single shard (e.g. on a machine with three or fewer cores) this is
+just a serial pytest run, without xdist.
+
+Pytest options (e.g. -k, -m, -x) apply to both collection and the shards.
+Select tests with options rather than paths: each shard is given its own
+test IDs. Coverage is disabled per shard; run plain `pytest` for coverage.
+
+The shards share one `.pytest_cache`, so each would overwrite the others'
+record of failed tests. Instead this script is also loaded into every shard
+as a pytest plugin that reports the shard's failures, and the combined record
+is written once all shards finish, so `pytest --lf` works afterwards.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib.util import find_spec
+from typing import List
+
+# Where a shard's plugin writes its report (set only for shard processes)
+REPORT_ENV = "PYTEST_SHARD_REPORT"
+
+
+def default_shards() -> int:
+    """One shard per core, minus two kept free for interactive work"""
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+def base_command() -> List[str]:
+    """pytest invocation that turns off per-process parallelism and coverage"""
+    command = [sys.executable, "-m", "pytest"]
+    if find_spec("xdist"):
+        command += ["-n", "0"]  # The shards are the parallelism
+    if find_spec("pytest_cov"):
+        command.append("--no-cov")  # Per-shard coverage would be partial
+    return command
+
+
+def collect(pytest_args: List[str]) -> List[str]:
+    """Collect the node IDs of every selected test"""
+    result = subprocess.run(
+        # Verbosity is forced last: -q output lists one node ID per line,
+        # whatever -q/-v flags the user passed
+        base_command() + ["--collect-only", *pytest_args, "--verbosity=-1"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stdout.write(result.stdout)
+        sys.stderr.write(result.stderr)
+        sys.exit(result.returncode)
+    return [line for line in result.stdout.splitlines() if "::" in line]
+
+
+def split(node_ids: List[str], shards: int) -> List[List[str]]:
+    """Split node IDs into at most `shards` contiguous, evenly sized chunks"""
+    size = -(-len(node_ids) // shards)  # Ceiling division
+    return [node_ids[i:i + size] for i in range(0, len(node_ids), size)]
+
+
+def pytest_sessionfinish(session):
+    """Plugin hook, run in each shard: report which of its tests failed"""
+    path = os.environ.get(REPORT_ENV)
+    lfplugin = session.config.pluginmanager.get_plugin("lfplugin")
+    if not path or lfplugin is None:
+        return  # Not a shard, or the cache is disabled (-p no:cacheprovider)
+    ran = {item.nodeid for item in session.items}
+    cache_dir = session.config.rootpath / os.path.expanduser(
+        os.path.expandvars(session.config.getini("cache_dir")))
+    with open(path, "w") as f:
+        json.dump({
+            "lastfailed": os.path.join(cache_dir, "v", "cache", "lastfailed"),
+            "ran": sorted(ran),
+            "failed": sorted(nodeid for nodeid in lfplugin.lastfailed if nodeid in ran),
+        }, f)
+
+
+def run_shard(index: int, node_ids: List[str], pytest_args: List[str], report: str):
+    """Run one shard, capturing its output so shards don't interleave"""
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, **{REPORT_ENV: report})
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [scripts_dir, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        base_command() + ["-p", "run_tests_sharded", *pytest_args, *node_ids],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=env,
+    )
+    return index, result.returncode, result.stdout
+
+
+def merge_lastfailed(reports: List[str]):
+    """Rewrite the failed-test record from every shard's report.
+
+    Each shard saved the record as it started, updated with only its own
+    results, so whichever finished last left a record that is correct only
+    for tests no shard ran. Results of the tests the shards ran replace them.
+    """
+    loaded = []
+    for report in reports:
+        try:
+            with open(report) as f:
+                loaded.append(json.load(f))
+        except (OSError, ValueError):
+            return  # A shard crashed or ran without the cache: leave the record alone
+    if not loaded:
+        return
+
+    path = loaded[0]["lastfailed"]
+    try:
+        with open(path) as f:
+            lastfailed = json.load(f)
+    except (OSError, ValueError):
+        lastfailed = {}
+    for shard in loaded:
+        for nodeid in shard["ran"]:
+            lastfailed.pop(nodeid, None)
+    for shard in loaded:
+        lastfailed.update(dict.fromkeys(shard["failed"], True))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(lastfailed, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the test suite in parallel shards")
+    parser.add_argument("--shards", type=int, default=default_shards(),
+                        help="Number of concurrent pytest processes (default: cores - 2)")
+    args, pytest_args = parser.parse_known_args()
+
+    if args.shards <= 1:
+        # Nothing to shard: replace this process with one plain, serial pytest
+        # run so tracebacks come from a single process
+        command = [sys.executable, "-m", "pytest"]
+        if find_spec("xdist"):
+            command += ["-n", "0"]
+        os.execv(sys.executable, command + pytest_args)
+
+    node_ids = collect(pytest_args)
+    if not node_ids:
+        print("No tests collected")
+        sys.exit(5)  # pytest's "no tests collected" exit code
+
+    chunks = split(node_ids, args.shards)
+    print(f"Running {len(node_ids)} tests in {len(chunks)} shard(s)")
+
+    exit_codes = []
+    with tempfile.TemporaryDirectory(prefix="pytest-shards-") as tmp:
+        reports = [os.path.join(tmp, f"shard{i}.json") for i in range(1, len(chunks) + 1)]
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [executor.submit(run_shard, i, chunk, pytest_args, report)
+                       for i, (chunk, report) in enumerate(zip(chunks, reports), 1)]
+            for future in as_completed(futures):
+                index, code, output = future.result()
+                sys.stdout.write(f"\n===== shard {index}/{len(chunks)} (exit {code}) =====\n{output}")
+                exit_codes.append(code)
+        merge_lastfailed(reports)
+
+    sys.exit(max(exit_codes))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,27 +5,48 @@ This file contains pytest configuration and fixtures that are
 available to all test modules in the project.
 """
 
-import pytest
+import io
+import types
 from pathlib import Path
 
+import pytest
+
 
-@pytest.fixture
+class FakeTextFile:
+    """In-memory stand-in for a text file with the ``pathlib.Path`` read/write API."""
+    
+    def __init__(self, content: str = ""):
+        self._buffer = io.StringIO(content)
+    
+    def read_text(self) -> str:
+        return self._buffer.getvalue()
+    
+    def write_text(self, data: str) -> int:
+        self._buffer = io.StringIO(data)
+        return len(data)
+
+
+@pytest.fixture(scope="session")
 def sample_data():
-    """Provide sample data for testing."""
-    return {
+    """Provide read-only sample data, built once per session.
+    
+    Use ``dict(sample_data)`` when a test needs a mutable copy.
+    """
+    return types.MappingProxyType({
         "test_string": "Hello, World!",
         "test_number": 42,
         "test_list": [1, 2, 3, 4, 5],
         "test_dict": {"key": "value", "nested": {"inner": "data"}}
-    }
+    })
 
 
 @pytest.fixture
-def temp_file(tmp_path):
-    """Create a temporary file for testing."""
-    file_path = tmp_path / "test_file.txt"
-    file_path.write_text("Test content")
-    return file_path
+def temp_file():
+    """Provide an in-memory text file, so file tests never touch the disk.
+    
+    Use ``tmp_path`` instead when the code under test needs a real path.
+    """
+    return FakeTextFile("Test content")
 
 
 @pytest.fixture
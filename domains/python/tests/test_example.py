@@ -3,11 +3,28 @@ Example test module demonstrating testing patterns and best practices.
 
 This module shows how to structure tests and use fixtures effectively.
 Remove this file once you have actual tests for your project.
+
+When expected values are expensive to compute (reference data, large
+generated inputs), cache them across sessions with the ``use_cache`` fixture
+from pytest-pickle-cache instead of writing a slow fixture::
+
+    def test_report(use_cache):
+        expected = use_cache("report_reference", build_reference_report)
+        assert build_report() == expected
+
+Change the key whenever the generator changes; ``pytest --cache-clear``
+drops every cached value.
 """
 
+import re
+import time
+
 import pytest
 
 
+_INVALID_LITERAL = re.compile("invalid literal")
+
+
 def test_example_basic():
     """Test basic assertions and patterns."""
     # Arrange
@@ -28,18 +45,26 @@ def test_example_with_fixture(sample_data):
     assert len(sample_data["test_list"]) == 5
 
 
-def test_example_parametrized():
-    """Test with parametrized inputs."""
-    test_cases = [
-        (1, 1, 2),
-        (2, 3, 5),
-        (0, 0, 0),
-        (-1, 1, 0),
-    ]
+def test_example_with_shared_fixture(sample_data):
+    """Test that copies a session-scoped fixture before changing it."""
+    # sample_data is shared by every test in the session, so it is read-only
+    with pytest.raises(TypeError):
+        sample_data["test_number"] = 0
     
-    for a, b, expected in test_cases:
-        result = a + b
-        assert result == expected
+    data = dict(sample_data)
+    data["test_number"] = 0
+    assert sample_data["test_number"] == 42
+
+
+@pytest.mark.parametrize("a,b,expected", [
+    (1, 1, 2),
+    (2, 3, 5),
+    (0, 0, 0),
+    (-1, 1, 0),
+])
+def test_example_parametrized(a, b, expected):
+    """Test with parametrized inputs."""
+    assert a + b == expected
 
 
 @pytest.mark.parametrize("input_val,expected", [
@@ -54,12 +79,13 @@ def test_string_upper(input_val, expected):
     assert result == expected
 
 
+def test_temp_file_initial_content(temp_file):
+    """Test the temporary file fixture's initial content."""
+    assert temp_file.read_text() == "Test content"
+
+
 def test_file_operations(temp_file):
     """Test file operations using temporary file fixture."""
-    # Read content
-    content = temp_file.read_text()
-    assert content == "Test content"
-    
     # Write new content
     new_content = "Updated content"
     temp_file.write_text(new_content)
@@ -70,7 +96,7 @@ def test_file_operations(temp_file):
 
 def test_exception_handling():
     """Test exception handling patterns."""
-    with pytest.raises(ValueError, match="invalid literal"):
+    with pytest.raises(ValueError, match=_INVALID_LITERAL):
         int("not_a_number")
     
     with pytest.raises(ZeroDivisionError):
@@ -78,22 +104,21 @@ def test_exception_handling():
 
 
 @pytest.mark.slow
-def test_slow_operation():
+def test_slow_operation(monkeypatch):
     """Example of marking slow tests."""
-    # This test would take a long time
-    # Use: pytest -m "not slow" to skip slow tests
-    import time
+    # This test would take a long time, so it is skipped by default
+    # Use: pytest -m "slow or not slow" to include slow tests
+    # Keep the slow call path but skip the wall-clock wait
+    monkeypatch.setattr(time, "sleep", lambda *_: None)
     time.sleep(0.1)  # Simulate slow operation
     assert True
 
 
-class TestExampleClass:
-    """Example test class for grouping related tests."""
-    
-    def test_class_method_one(self):
-        """Test method in a class."""
-        assert True
-    
-    def test_class_method_two(self, sample_data):
-        """Another test method using fixture."""
-        assert isinstance(sample_data["test_dict"], dict)
\ No newline at end of file
+def test_class_method_one():
+    """Test written as a plain function rather than a class method."""
+    assert True
+
+
+def test_class_method_two(sample_data):
+    """Another plain test function using a fixture."""
+    assert isinstance(sample_data["test_dict"], dict)
\ No newline at end of file